@@ -7,29 +7,37 @@ import sys
 import json
 import logging
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional, Union
 from dataclasses import dataclass
+from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import traceback
+import unicodedata
 
 # 尝试导入所需的库
 try:
-    from packaging.requirements import Requirement
-    from packaging.specifiers import SpecifierSet
-    from packaging.version import Version, parse
-    from tabulate import tabulate
+    from packaging.requirements import Requirement, InvalidRequirement
+    from packaging.specifiers import SpecifierSet, InvalidSpecifier
+    from packaging.version import Version, InvalidVersion, parse
     import colorama
     from colorama import Fore, Style
 except ImportError as e:
     print(f"错误: 缺少必要的依赖库: {e}")
     print("请确保已安装以下依赖:")
     print("  - packaging")
-    print("  - tabulate")
     print("  - colorama")
     print("\n可以使用以下命令安装:")
-    print("  pip install packaging tabulate colorama")
+    print("  pip install packaging colorama")
     input("\n按回车键退出...")
     sys.exit(1)
 
+# 可选依赖：安装orjson后用于加速JSON报告的生成
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 初始化colorama
 colorama.init()
 
@@ -43,9 +51,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger('dependency_resolver')
 
-@dataclass
+# 缓存解析结果，多个插件常常声明相同的依赖行和版本号
+_parse_req = lru_cache(maxsize=4096)(Requirement)
+_parse_ver = lru_cache(maxsize=8192)(parse)
+_parse_spec = lru_cache(maxsize=4096)(SpecifierSet)
+
+# 常见的 "name" / "name==1.2.3" 形式的依赖行，可以跳过Requirement的完整解析
+_SIMPLE_REQ = re.compile(
+    r'^([A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*'
+    r'(?:(==|>=|<=|~=|!=|>|<)\s*([A-Za-z0-9_.\-+*]+))?$'
+)
+
+if orjson is not None:
+    def _encode_json(obj) -> bytes:
+        """将对象编码为缩进两格的JSON字节串"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    _json_encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+    
+    def _encode_json(obj) -> bytes:
+        """将对象编码为缩进两格的JSON字节串"""
+        return _json_encoder.encode(obj).encode('utf-8')
+
+# 判断用户输入的依赖信息是否包含版本运算符
+_HAS_OP = re.compile(r'[<>]|[=~!]=')
+
+def _split_requirement(line: str) -> Tuple[str, SpecifierSet]:
+    """
+    解析依赖行，返回依赖名称和版本要求
+    
+    Args:
+        line: 去除首尾空白的依赖行
+        
+    Returns:
+        (依赖名称, 版本要求)
+    """
+    match = _SIMPLE_REQ.match(line)
+    if match:
+        name, op, version = match.groups()
+        return name, _parse_spec(f"{op}{version}" if op else "")
+    
+    # 含有extras、环境标记或URL的行交给packaging完整解析
+    req = _parse_req(line)
+    return req.name, req.specifier
+
+@dataclass(frozen=True)
 class DependencyRequirement:
     """依赖需求类，用于存储依赖的名称和版本要求"""
+    __slots__ = ('name', 'specifier', 'original_line', 'plugin_name')
+    
     name: str
     specifier: SpecifierSet
     original_line: str
@@ -57,9 +111,74 @@ class DependencyRequirement:
 @dataclass
 class ConflictInfo:
     """冲突信息类，用于存储冲突的依赖信息"""
+    __slots__ = ('dependency_name', 'conflicting_plugins')
+    
     dependency_name: str
     conflicting_plugins: List[Tuple[str, str]]  # 插件名称和版本要求
 
+def _display_width(text: str) -> int:
+    """计算字符串在终端中的显示宽度，中日韩等宽字符占两列"""
+    return sum(2 if unicodedata.east_asian_width(ch) in ('W', 'F') else 1 for ch in text)
+
+def _format_grid(rows: List[Tuple[str, str]], headers: Tuple[str, str]) -> str:
+    """
+    将两列数据格式化为网格表格
+    
+    Args:
+        rows: 表格数据行
+        headers: 表头
+        
+    Returns:
+        表格字符串
+    """
+    widths = [
+        max(_display_width(row[col]) for row in (headers, *rows))
+        for col in range(2)
+    ]
+    
+    def format_row(row: Tuple[str, str]) -> str:
+        cells = (cell + " " * (width - _display_width(cell)) for cell, width in zip(row, widths))
+        return "| " + " | ".join(cells) + " |"
+    
+    border = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+    header_border = "+" + "+".join("=" * (width + 2) for width in widths) + "+"
+    
+    lines = [border, format_row(headers), header_border]
+    for row in rows:
+        lines.append(format_row(row))
+        lines.append(border)
+    return "\n".join(lines)
+
+def _candidate_versions(requirements: List[DependencyRequirement]) -> List[Union[Version, str]]:
+    """
+    收集用于判断版本要求能否同时满足的候选版本
+    
+    Args:
+        requirements: 同一依赖的所有需求
+        
+    Returns:
+        排序后的候选版本列表，之后是 "===" 要求中的原始版本字符串
+    """
+    candidates = {_parse_ver("0"), _parse_ver("999999")}
+    arbitrary = set()
+    for req in requirements:
+        for spec in req.specifier:
+            version = spec.version
+            if spec.operator == '===':
+                # "===" 按字符串精确匹配，保留原始字符串供SpecifierSet判断
+                arbitrary.add(version)
+                continue
+            if version.endswith('.*'):
+                version = version[:-2]
+            try:
+                candidate = _parse_ver(version)
+            except InvalidVersion:
+                continue
+            candidates.add(candidate)
+            # 紧跟在该版本之后的版本，用于满足 ">X"、"!=X" 这类开区间
+            candidates.add(_parse_ver(f"{candidate.base_version}.0.0.0.1"))
+    return sorted(candidates) + sorted(arbitrary)
+
 class DependencyResolver:
     """依赖冲突解决工具的主类"""
     
@@ -79,36 +198,64 @@ class DependencyResolver:
         self.all_requirements: Dict[str, List[DependencyRequirement]] = {}
         
         # 按依赖名称组织的需求
-        self.dependency_requirements: Dict[str, List[DependencyRequirement]] = {}
+        self.dependency_requirements: Dict[str, List[DependencyRequirement]] = defaultdict(list)
         
+    def _discover(self) -> Tuple[List[str], List[Tuple[str, Path]]]:
+        """
+        查找所有插件的requirements.txt文件
+        
+        Returns:
+            (没有requirements.txt的插件名称列表, (插件名称, requirements.txt路径) 列表)
+        """
+        missing: List[str] = []
+        req_files: List[Tuple[str, Path]] = []
+        
+        # os.scandir在读取目录时即可得到文件类型，无需对每个条目单独stat
+        with os.scandir(self.plugins_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                
+                req_path = os.path.join(entry.path, "requirements.txt")
+                
+                if not os.path.exists(req_path):
+                    missing.append(entry.name)
+                    continue
+                
+                req_files.append((entry.name, Path(req_path)))
+        
+        return missing, req_files
+    
     def scan_plugins(self) -> None:
         """扫描插件目录，解析所有requirements.txt文件"""
-        logger.info(f"扫描插件目录: {self.plugins_dir}")
+        logger.info("扫描插件目录: %s", self.plugins_dir)
         
         if not self.plugins_dir.exists():
-            logger.error(f"插件目录不存在: {self.plugins_dir}")
+            logger.error("插件目录不存在: %s", self.plugins_dir)
             print(f"{Fore.RED}错误: 插件目录不存在: {self.plugins_dir}{Style.RESET_ALL}")
             return
         
         # 遍历插件目录
-        plugin_count = 0
-        req_file_count = 0
-        
-        for plugin_dir in self.plugins_dir.iterdir():
-            if not plugin_dir.is_dir():
-                continue
-            
-            plugin_count += 1
-            plugin_name = plugin_dir.name
-            req_file = plugin_dir / "requirements.txt"
-            
-            if not req_file.exists():
-                logger.info(f"插件 {plugin_name} 没有requirements.txt文件，跳过")
-                continue
+        missing, req_files = self._discover()
+        for plugin_name in missing:
+            logger.info("插件 %s 没有requirements.txt文件，跳过", plugin_name)
+        
+        plugin_count = len(missing) + len(req_files)
+        req_file_count = len(req_files)
+        
+        # 文件读取以I/O为主，使用线程池并行解析，结果在主线程中汇总
+        if req_files:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(lambda item: self.parse_requirements(*item), req_files))
             
-            req_file_count += 1
-            logger.info(f"解析插件 {plugin_name} 的requirements.txt文件")
-            self.parse_requirements(plugin_name, req_file)
+            for (plugin_name, _), requirements in zip(req_files, results):
+                if requirements is None:
+                    continue
+                self.all_requirements[plugin_name] = requirements
+                for dep_req in requirements:
+                    # 按依赖名称组织
+                    self.dependency_requirements[dep_req.name].append(dep_req)
         
         if plugin_count == 0:
             print(f"{Fore.YELLOW}警告: 未在指定目录中找到任何插件文件夹{Style.RESET_ALL}")
@@ -117,56 +264,62 @@ class DependencyResolver:
         else:
             print(f"{Fore.GREEN}成功扫描 {plugin_count} 个插件文件夹，找到 {req_file_count} 个requirements.txt文件{Style.RESET_ALL}")
     
-    def parse_requirements(self, plugin_name: str, req_file: Path) -> None:
+    def parse_requirements(self, plugin_name: str, req_file: Path) -> Optional[List[DependencyRequirement]]:
         """
-        解析requirements.txt文件
+        解析requirements.txt文件，不修改解析器状态，可在线程池中调用
         
         Args:
             plugin_name: 插件名称
             req_file: requirements.txt文件路径
+            
+        Returns:
+            依赖需求列表，文件无法读取时返回None
         """
+        logger.debug("解析插件 %s 的requirements.txt文件", plugin_name)
         requirements = []
+        # 同一插件的所有依赖共享一个名称字符串
+        plugin_name = sys.intern(plugin_name)
         
         try:
-            with open(req_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # 跳过空行和注释
-                    if not line or line.startswith('#'):
-                        continue
+            lines = req_file.read_text(encoding='utf-8', errors='replace').splitlines()
+            for line_num, line in enumerate(lines, 1):
+                line = line.strip()
+                
+                # 跳过空行和注释
+                if not line or line.startswith('#'):
+                    continue
+                
+                try:
+                    # 解析依赖
+                    name, specifier = _split_requirement(line)
+                    dep_req = DependencyRequirement(
+                        name=sys.intern(name.lower()),  # 统一使用小写名称
+                        specifier=specifier,
+                        original_line=line,
+                        plugin_name=plugin_name
+                    )
+                    requirements.append(dep_req)
                     
-                    try:
-                        # 使用packaging库解析依赖
-                        req = Requirement(line)
-                        dep_req = DependencyRequirement(
-                            name=req.name.lower(),  # 统一使用小写名称
-                            specifier=req.specifier,
-                            original_line=line,
-                            plugin_name=plugin_name
-                        )
-                        requirements.append(dep_req)
-                        
-                        # 按依赖名称组织
-                        if dep_req.name not in self.dependency_requirements:
-                            self.dependency_requirements[dep_req.name] = []
-                        self.dependency_requirements[dep_req.name].append(dep_req)
-                        
-                    except Exception as e:
-                        logger.warning(f"无法解析 {plugin_name} 的依赖 (行 {line_num}): {line}")
-                        logger.warning(f"错误: {str(e)}")
-        except Exception as e:
-            logger.error(f"无法读取文件 {req_file}: {str(e)}")
+                except (InvalidRequirement, InvalidSpecifier) as e:
+                    logger.warning("无法解析 %s 的依赖 (行 %s): %s", plugin_name, line_num, line)
+                    logger.warning("错误: %s", e)
+        except OSError as e:
+            logger.error("无法读取文件 %s: %s", req_file, e)
             print(f"{Fore.RED}错误: 无法读取文件 {req_file}: {str(e)}{Style.RESET_ALL}")
-            return
+            return None
         
-        self.all_requirements[plugin_name] = requirements
-        logger.info(f"插件 {plugin_name} 解析完成，找到 {len(requirements)} 个依赖")
+        logger.info("插件 %s 解析完成，找到 %s 个依赖", plugin_name, len(requirements))
+        return requirements
     
     def detect_conflicts(self) -> List[ConflictInfo]:
         """
         检测依赖冲突
         
+        将每个插件的版本要求合并为一个SpecifierSet，用所有版本要求中出现的版本号
+        作为候选版本：没有任何候选版本能同时满足所有插件时即为冲突。
+        每个冲突报告一个极小的冲突插件集合，去掉其中任意一个插件冲突即消失；
+        同一依赖存在多处独立冲突时，会依次报告多个集合。
+        
         Returns:
             冲突信息列表
         """
@@ -176,62 +329,52 @@ class DependencyResolver:
             if len(requirements) <= 1:
                 continue  # 只有一个插件使用此依赖，不可能冲突
             
-            # 找出所有最低版本要求
-            min_versions = {}
-            for req in requirements:
-                for spec in req.specifier:
-                    if spec.operator in ('>=', '==', '>'):
-                        if req.plugin_name not in min_versions:
-                            min_versions[req.plugin_name] = (spec.version, spec.operator)
-                        else:
-                            current_ver, current_op = min_versions[req.plugin_name]
-                            if parse(spec.version) > parse(current_ver):
-                                min_versions[req.plugin_name] = (spec.version, spec.operator)
-            
-            # 找出所有最高版本要求
-            max_versions = {}
+            # 合并同一插件对该依赖的所有版本要求
+            plugin_specs: Dict[str, SpecifierSet] = {}
             for req in requirements:
-                for spec in req.specifier:
-                    if spec.operator in ('<=', '==', '<'):
-                        if req.plugin_name not in max_versions:
-                            max_versions[req.plugin_name] = (spec.version, spec.operator)
-                        else:
-                            current_ver, current_op = max_versions[req.plugin_name]
-                            if parse(spec.version) < parse(current_ver):
-                                max_versions[req.plugin_name] = (spec.version, spec.operator)
+                if req.plugin_name in plugin_specs:
+                    plugin_specs[req.plugin_name] &= req.specifier
+                else:
+                    plugin_specs[req.plugin_name] = req.specifier
             
-            # 检查冲突：某些插件要求的最低版本高于其他插件要求的最高版本
-            conflict_found = False
-            conflicting_plugins = []
+            # 用位掩码记录每个插件满足的候选版本，第i位对应第i个候选版本
+            candidates = _candidate_versions(requirements)
+            masks: Dict[str, int] = {}
+            for plugin, spec_set in plugin_specs.items():
+                mask = 0
+                for i, candidate in enumerate(candidates):
+                    if spec_set.contains(candidate, prereleases=True):
+                        mask |= 1 << i
+                masks[plugin] = mask
             
-            for plugin_min, (min_ver, min_op) in min_versions.items():
-                min_version = parse(min_ver)
+            # 每轮逐个尝试移除插件，移除后仍然冲突则说明该插件不是冲突的必要部分，
+            # 得到一个极小的冲突插件集合；再在剩余插件中继续查找，直到剩余插件可以同时满足
+            remaining = dict(masks)
+            while True:
+                common = -1
+                for mask in remaining.values():
+                    common &= mask
+                if common:
+                    break  # 存在同时满足剩余插件的版本
+                
+                conflicting = dict(remaining)
+                for plugin in list(conflicting):
+                    rest = -1
+                    for other, mask in conflicting.items():
+                        if other != plugin:
+                            rest &= mask
+                    if not rest:
+                        del conflicting[plugin]
+                
+                for plugin in conflicting:
+                    del remaining[plugin]
                 
-                for plugin_max, (max_ver, max_op) in max_versions.items():
-                    max_version = parse(max_ver)
-                    
-                    # 检查是否冲突
-                    if min_version > max_version or (min_version == max_version and (min_op == '>' or max_op == '<')):
-                        conflict_found = True
-                        min_req_str = f"{min_op}{min_ver}" if min_op else ""
-                        max_req_str = f"{max_op}{max_ver}" if max_op else ""
-                        
-                        # 获取完整的版本要求字符串
-                        for req in requirements:
-                            if req.plugin_name == plugin_min:
-                                min_req_str = str(req.specifier)
-                            if req.plugin_name == plugin_max:
-                                max_req_str = str(req.specifier)
-                        
-                        conflicting_plugins.append((plugin_min, min_req_str))
-                        if (plugin_max, max_req_str) not in conflicting_plugins:
-                            conflicting_plugins.append((plugin_max, max_req_str))
-            
-            # 如果找到冲突，添加到冲突列表
-            if conflict_found:
                 conflicts.append(ConflictInfo(
                     dependency_name=dep_name,
-                    conflicting_plugins=conflicting_plugins
+                    conflicting_plugins=[
+                        (plugin, str(plugin_specs[plugin]))
+                        for plugin in conflicting
+                    ]
                 ))
         
         return conflicts
@@ -252,11 +395,7 @@ class DependencyResolver:
         for conflict in conflicts:
             print(f"\n{Fore.YELLOW}依赖: {conflict.dependency_name}{Style.RESET_ALL}")
             
-            table_data = []
-            for plugin, version_req in conflict.conflicting_plugins:
-                table_data.append([plugin, version_req])
-            
-            print(tabulate(table_data, headers=["插件", "版本要求"], tablefmt="grid"))
+            print(_format_grid(conflict.conflicting_plugins, ("插件", "版本要求")))
     
     def generate_conflict_report(self, conflicts: List[ConflictInfo]) -> str:
         """
@@ -291,29 +430,30 @@ class DependencyResolver:
                     
                     f.write("\n")
             
-            # 同时生成JSON格式的报告
+            # 同时生成JSON格式的报告，逐个冲突写入，不在内存中构建完整列表
             json_report_file = self.output_dir / "conflict_report.json"
-            json_data = []
-            
-            for conflict in conflicts:
-                conflict_data = {
-                    "dependency_name": conflict.dependency_name,
-                    "conflicting_plugins": [
-                        {"plugin": plugin, "version_requirement": version_req}
-                        for plugin, version_req in conflict.conflicting_plugins
-                    ]
-                }
-                json_data.append(conflict_data)
             
-            with open(json_report_file, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
+            with open(json_report_file, 'wb') as f:
+                f.write(b"[")
+                for i, conflict in enumerate(conflicts):
+                    conflict_data = {
+                        "dependency_name": conflict.dependency_name,
+                        "conflicting_plugins": [
+                            {"plugin": plugin, "version_requirement": version_req}
+                            for plugin, version_req in conflict.conflicting_plugins
+                        ]
+                    }
+                    f.write(b",\n  " if i else b"\n  ")
+                    # 数组元素整体缩进一级，字符串中的换行已被转义，不受影响
+                    f.write(_encode_json(conflict_data).replace(b"\n", b"\n  "))
+                f.write(b"\n]" if conflicts else b"]")
             
-            logger.info(f"冲突报告已生成: {report_file}")
-            logger.info(f"JSON格式报告已生成: {json_report_file}")
+            logger.info("冲突报告已生成: %s", report_file)
+            logger.info("JSON格式报告已生成: %s", json_report_file)
             
             return str(report_file)
         except Exception as e:
-            logger.error(f"生成报告时出错: {str(e)}")
+            logger.error("生成报告时出错: %s", e)
             print(f"{Fore.RED}错误: 生成报告时出错: {str(e)}{Style.RESET_ALL}")
             return ""
     
@@ -328,21 +468,21 @@ class DependencyResolver:
         Returns:
             替换的文件数量
         """
-        logger.info(f"替换依赖: {old_dep} -> {new_dep}")
+        logger.info("替换依赖: %s -> %s", old_dep, new_dep)
         
         # 解析原依赖信息
         old_dep_name = old_dep
         old_dep_version = ""
         
         # 检查是否包含版本信息
-        if any(op in old_dep for op in ['==', '>=', '<=', '>', '<', '~=']):
+        if _HAS_OP.search(old_dep):
             try:
                 old_req = Requirement(old_dep)
                 old_dep_name = old_req.name.lower()
                 old_dep_version = str(old_req.specifier)
-            except Exception as e:
-                logger.error(f"无法解析原依赖信息: {old_dep}")
-                logger.error(f"错误: {str(e)}")
+            except InvalidRequirement as e:
+                logger.error("无法解析原依赖信息: %s", old_dep)
+                logger.error("错误: %s", e)
                 print(f"{Fore.RED}错误: 无法解析原依赖信息: {old_dep}{Style.RESET_ALL}")
                 print(f"{Fore.RED}详细错误: {str(e)}{Style.RESET_ALL}")
                 return 0
@@ -351,16 +491,16 @@ class DependencyResolver:
         
         # 解析新依赖信息
         try:
-            if any(op in new_dep for op in ['==', '>=', '<=', '>', '<', '~=']):
+            if _HAS_OP.search(new_dep):
                 new_req = Requirement(new_dep)
                 new_dep_name = new_req.name
                 new_dep_full = new_dep
             else:
                 new_dep_name = new_dep
                 new_dep_full = new_dep
-        except Exception as e:
-            logger.error(f"无法解析新依赖信息: {new_dep}")
-            logger.error(f"错误: {str(e)}")
+        except InvalidRequirement as e:
+            logger.error("无法解析新依赖信息: %s", new_dep)
+            logger.error("错误: %s", e)
             print(f"{Fore.RED}错误: 无法解析新依赖信息: {new_dep}{Style.RESET_ALL}")
             print(f"{Fore.RED}详细错误: {str(e)}{Style.RESET_ALL}")
             return 0
@@ -368,71 +508,59 @@ class DependencyResolver:
         # 记录替换情况
         replaced_files = set()
         
+        # 在原始字节上预先过滤，只有可能包含原依赖的文件才逐行解析
+        old_dep_pattern = re.compile(rb'(?im)^\s*' + re.escape(old_dep_name.encode('utf-8')) + rb'\b')
+        
         # 遍历插件目录
-        for plugin_dir in self.plugins_dir.iterdir():
-            if not plugin_dir.is_dir():
-                continue
-            
-            plugin_name = plugin_dir.name
-            req_file = plugin_dir / "requirements.txt"
-            
-            if not req_file.exists():
-                continue
-            
+        _, req_files = self._discover()
+        for plugin_name, req_file in req_files:
             # 读取requirements.txt文件
             try:
-                with open(req_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-            except Exception as e:
-                logger.error(f"无法读取文件 {req_file}: {str(e)}")
+                content = req_file.read_bytes()
+                if not old_dep_pattern.search(content):
+                    continue
+                lines = content.decode('utf-8').splitlines(keepends=True)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.error("无法读取文件 %s: %s", req_file, e)
                 print(f"{Fore.RED}错误: 无法读取文件 {req_file}: {str(e)}{Style.RESET_ALL}")
                 continue
             
             # 标记是否需要更新文件
             file_updated = False
-            new_lines = []
             
-            for line in lines:
-                original_line = line
-                line = line.strip()
+            for i, original_line in enumerate(lines):
+                line = original_line.strip()
                 
                 # 跳过空行和注释
                 if not line or line.startswith('#'):
-                    new_lines.append(original_line)
                     continue
                 
                 try:
                     # 解析依赖
-                    req = Requirement(line)
-                    dep_name = req.name.lower()
-                    dep_version = str(req.specifier)
-                    
-                    # 检查是否匹配替换条件
-                    if dep_name == old_dep_name:
-                        if not old_dep_version or dep_version == old_dep_version:
-                            # 执行替换
-                            new_lines.append(f"{new_dep_full}\n")
-                            file_updated = True
-                            logger.info(f"在插件 {plugin_name} 中替换: {line} -> {new_dep_full}")
-                        else:
-                            new_lines.append(original_line)
-                    else:
-                        new_lines.append(original_line)
-                except Exception:
+                    name, specifier = _split_requirement(line)
+                except (InvalidRequirement, InvalidSpecifier):
                     # 无法解析的行保持不变
-                    new_lines.append(original_line)
+                    continue
+                
+                # 检查是否匹配替换条件
+                if name.lower() == old_dep_name:
+                    if not old_dep_version or str(specifier) == old_dep_version:
+                        # 执行替换，保留原行的换行符，避免文件中混用不同的换行风格
+                        ending = original_line[len(original_line.rstrip('\r\n')):] or '\n'
+                        lines[i] = new_dep_full + ending
+                        file_updated = True
+                        logger.info("在插件 %s 中替换: %s -> %s", plugin_name, line, new_dep_full)
             
             # 如果文件需要更新，写入新内容
             if file_updated:
                 try:
-                    with open(req_file, 'w', encoding='utf-8') as f:
-                        f.writelines(new_lines)
+                    req_file.write_bytes(''.join(lines).encode('utf-8'))
                     replaced_files.add(str(req_file))
-                except Exception as e:
-                    logger.error(f"无法写入文件 {req_file}: {str(e)}")
+                except OSError as e:
+                    logger.error("无法写入文件 %s: %s", req_file, e)
                     print(f"{Fore.RED}错误: 无法写入文件 {req_file}: {str(e)}{Style.RESET_ALL}")
         
-        logger.info(f"依赖替换完成，共更新了 {len(replaced_files)} 个文件")
+        logger.info("依赖替换完成，共更新了 %s 个文件", len(replaced_files))
         return len(replaced_files)
 
 def check_conflicts(plugins_dir: str) -> None: